@@ -1,12 +1,18 @@
 # scripts/simulate_client.py
-import asyncio, websockets, json, numpy as np
+import asyncio, websockets, json, time, numpy as np
 
-async def run(ws_url="ws://localhost:8000/ws"):
+async def run(ws_url="ws://localhost:8000/ws", print_every=1.0):
     async with websockets.connect(ws_url) as ws:
+        count, last_print = 0, 0.0
         while True:
             # wait for messages from server (if server broadcasts)
             msg = await ws.recv()
-            print("RECV:", msg)
+            count += 1
+            # the mock server sends ~30 frames/s; printing each one would dominate the loop
+            now = time.monotonic()
+            if now - last_print >= print_every:
+                print(f"RECV ({count} total):", msg[:80], "...")
+                last_print = now
 
 if __name__ == "__main__":
     asyncio.run(run())
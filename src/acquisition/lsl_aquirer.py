@@ -2,33 +2,58 @@
 import time
 import argparse
 import numpy as np
-from pylsl import StreamInlet, resolve_stream
+from pylsl import StreamInlet, resolve_stream, cf_float32, cf_double64, cf_int8, cf_int16, cf_int32, cf_int64
 import os
 import json
 
+LSL_DTYPES = {cf_float32: np.float32, cf_double64: np.float64, cf_int8: np.int8,
+              cf_int16: np.int16, cf_int32: np.int32, cf_int64: np.int64}
+
+def lsl_dtype(info):
+    # buffer samples at the stream's own precision instead of always float64
+    # (string and undefined formats fall back to float64)
+    return LSL_DTYPES.get(info.channel_format(), np.float64)
+
 def save_window(window, meta, out_dir):
     ts = int(time.time()*1000)
     fname = os.path.join(out_dir, f"{meta['modality']}_window_{ts}.npz")
     np.savez_compressed(fname, data=window, meta=meta)
 
-def main(modality="EEG", out_dir="./data/raw", win_s=1.0, fs=250):
+def main(modality="EEG", out_dir="./data/raw", win_s=1.0, fs=250, hop_s=None):
+    buflen = int(fs * win_s)
+    hop = int(fs * hop_s) if hop_s else buflen
+    if hop < 1:
+        raise ValueError(f"hop_s={hop_s} is shorter than one sample at fs={fs}")
     # resolve first stream with matching name
     streams = resolve_stream()
     inlet = StreamInlet(streams[0])
-    buflen = int(fs * win_s)
-    buffer = []
+    # mirrored ring: each sample is written at i and i + buflen, so the latest
+    # window is always the contiguous slice ring[:, j:j + buflen] (no wraparound)
+    info = inlet.info()
+    ring = np.empty((info.channel_count(), 2 * buflen), dtype=lsl_dtype(info))
+    count = 0
 
     print("Listening to LSL stream. Press Ctrl-C to stop.")
     try:
         while True:
-            sample, timestamp = inlet.pull_sample(timeout=1.0)
-            if sample:
-                buffer.append(sample)
-            if len(buffer) >= buflen:
-                arr = np.array(buffer[-buflen:]).T  # shape (channels, samples)
+            # pull up to the next window boundary in one blocking call, so at most
+            # one window can complete per chunk (and no ring slot is written twice)
+            need = buflen - count if count < buflen else hop - (count - buflen) % hop
+            need = min(need, buflen)
+            chunk, stamps = inlet.pull_chunk(timeout=1.0, max_samples=need)
+            if not chunk:
+                continue
+            block = np.asarray(chunk).T
+            idx = (count + np.arange(block.shape[1])) % buflen
+            ring[:, idx] = block
+            ring[:, idx + buflen] = block
+            count += block.shape[1]
+            timestamp = stamps[-1]
+            if count >= buflen and (count - buflen) % hop == 0:
+                j = count % buflen
+                arr = ring[:, j:j + buflen]  # shape (channels, samples)
                 meta = {"modality": modality, "fs": fs, "timestamp": timestamp}
                 save_window(arr, meta, out_dir)
-                buffer = []  # sliding window behavior can be implemented
     except KeyboardInterrupt:
         print("Stopped.")
 
@@ -38,6 +63,9 @@ if __name__ == "__main__":
     parser.add_argument("--out_dir", default="./data/raw")
     parser.add_argument("--fs", type=int, default=250)
     parser.add_argument("--win_s", type=float, default=1.0)
+    parser.add_argument("--hop_s", type=float, default=None, help="window step (default: win_s, no overlap)")
     args = parser.parse_args()
+    if args.hop_s is not None and int(args.fs * args.hop_s) < 1:
+        parser.error(f"--hop_s must be at least one sample (1/fs = {1 / args.fs:g} s)")
     os.makedirs(args.out_dir, exist_ok=True)
-    main(args.modality, args.out_dir, args.win_s, args.fs)
+    main(args.modality, args.out_dir, args.win_s, args.fs, args.hop_s)
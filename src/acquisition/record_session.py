@@ -1,7 +1,11 @@
 # record_session.py
+import sys
 import time, json, os
 from pathlib import Path
+import numpy as np
 from pylsl import StreamInlet, resolve_stream, StreamOutlet, StreamInfo
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from acquisition.lsl_aquirer import lsl_dtype
 
 OUT_DIR = Path(__file__).resolve().parents[2] / "data" / "raw"
 OUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -12,20 +16,24 @@ def record_windows(win_s=1.0, fs=250, modality="EEG"):
         raise RuntimeError("No LSL streams found")
     inlet = StreamInlet(streams[0])
     buflen = int(win_s * fs)
-    buffer = []
+    # (channels, samples), filled in place; no per-sample lists
+    info = inlet.info()
+    window = np.empty((info.channel_count(), buflen), dtype=lsl_dtype(info))
+    n = 0
     print("Recording... Ctrl-C to stop")
     try:
         while True:
-            sample, ts = inlet.pull_sample(timeout=1.0)
-            if sample:
-                buffer.append(sample)
-            if len(buffer) >= buflen:
-                arr = [list(x) for x in buffer[-buflen:]]
+            # one call blocks until the rest of the window is in (or 1 s passes)
+            chunk, _ = inlet.pull_chunk(timeout=1.0, max_samples=buflen - n)
+            if chunk:
+                k = len(chunk)
+                window[:, n:n + k] = np.asarray(chunk).T
+                n += k
+            if n == buflen:
                 ts_ms = int(time.time() * 1000)
                 fname = OUT_DIR / f"{modality}_window_{ts_ms}.npz"
-                import numpy as np
-                np.savez_compressed(fname, data=np.array(arr).T, fs=fs, timestamp=ts_ms, modality=modality)
+                np.savez_compressed(fname, data=window, fs=fs, timestamp=ts_ms, modality=modality)
                 print("Saved", fname.name)
-                buffer = []
+                n = 0
     except KeyboardInterrupt:
         print("Stopped.")
@@ -23,13 +23,20 @@ time.sleep(2)  # Let connection stabilize
 
 print(f"Streaming mock data to {SERIAL_PORT}... Press Ctrl+C to stop.")
 
+start = time.monotonic()
+sent = 0
 try:
     while True:
         sample = generate_mock_sample()
         # Format: "val1,val2,...,val8\\n" (Chords expects CSV lines)
         line = ",".join(map(str, sample)) + "\n"
         ser.write(line.encode("utf-8"))
-        time.sleep(1.0 / FS)
+        sent += 1
+        # Sleep until this sample's deadline instead of a fixed 1/FS, so the time
+        # spent generating/writing and sleep overshoot don't slow the stream below FS
+        delay = start + sent / FS - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
 except KeyboardInterrupt:
     print("Stopped streaming.")
 finally:
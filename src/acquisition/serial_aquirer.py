@@ -1,33 +1,245 @@
 # serial_acquirer.py
 import serial
+import selectors
+import queue
+import threading
 import time
+from functools import lru_cache
 import numpy as np
 import os
+import sys
 import argparse
 
-def main(port="/dev/ttyUSB0", baud=115200, out_dir="./data/raw", win_s=0.5, fs=1000):
-    ser = serial.Serial(port, baud, timeout=1.0)
-    buf = []
+# Chords binary framing: sync1, sync2, counter, <channels x uint16 big-endian>, end
+SYNC_BYTE_1 = 0xC7
+SYNC_BYTE_2 = 0x7C
+END_BYTE = 0x01
+READ_CHUNK = 4096  # bytes per blocking read where select() is unavailable
+
+@lru_cache(maxsize=None)
+def packet_dtype(channels):
+    # one record per packet; serial_streamer packs with this same layout
+    return np.dtype([("sync", "u1", 2), ("counter", "u1"), ("data", ">u2", (channels,)), ("end", "u1")])
+
+def packet_len(channels):
+    return packet_dtype(channels).itemsize
+
+def parse_packets(rx, channels):
+    """
+    Decode every complete packet in `rx` in one vectorised pass.
+    Returns (samples, consumed): samples is (n_packets, channels) uint16 and
+    consumed is the number of leading bytes the caller can drop.
+    `rx` is viewed in place (no copy); nothing returned keeps the view alive,
+    so the caller can resize it afterwards.
+    """
+    size = packet_len(channels)
+    data_at = packet_dtype(channels).fields["data"][1]
+    b = np.frombuffer(rx, dtype=np.uint8)
+    n = len(b) - size + 1
+    if n <= 0:
+        return np.empty((0, channels), dtype=np.uint16), 0
+    starts = np.flatnonzero((b[:n] == SYNC_BYTE_1) & (b[1:n + 1] == SYNC_BYTE_2) & (b[size - 1:] == END_BYTE))
+    if len(starts) > 1 and (np.diff(starts) < size).any():
+        # a sync pattern inside a payload overlaps a real packet: keep the first of each overlap
+        keep, nxt = [], 0
+        for s in starts.tolist():
+            if s >= nxt:
+                keep.append(s)
+                nxt = s + size
+        starts = np.array(keep)
+    if len(starts) == 0:
+        return np.empty((0, channels), dtype=np.uint16), n
+    payload = b[starts[:, None] + np.arange(data_at, data_at + 2 * channels)]
+    samples = payload.view(">u2").astype(np.uint16)
+    return samples, max(int(starts[-1]) + size, n)
+
+def parse_lines(rx):
+    """
+    Split every complete CSV line off the front of `rx` and convert them together.
+    Returns (rows, consumed): rows is (n_lines, n_fields) float. Lines that are
+    not all numeric (boot banners, partial lines after a reset) are skipped.
+    """
+    end = rx.rfind(b"\n")
+    if end < 0:
+        return np.empty((0, 0)), 0
+    lines = [ln for ln in bytes(rx[:end]).replace(b"\r", b"").split(b"\n") if ln]
+    widths = {ln.count(b",") + 1 for ln in lines}
+    if len(widths) == 1:
+        # np.fromstring parses the whole block in C; reshaping to the exact width
+        # also catches older numpy returning a short array on bad input
+        try:
+            vals = np.fromstring(b",".join(lines), dtype=float, sep=",")
+            return vals.reshape(len(lines), widths.pop()), end + 1
+        except ValueError:
+            pass
+    rows = []
+    for ln in lines:
+        try:
+            rows.append(np.fromstring(ln, dtype=float, sep=",").reshape(ln.count(b",") + 1))
+        except ValueError:
+            continue
+    if not rows:
+        return np.empty((0, 0)), end + 1
+    # keep the rows shaped like the newest one so the block stays rectangular
+    return np.array([r for r in rows if len(r) == len(rows[-1])]), end + 1
+
+def tune_port(ser, rx_size=1 << 16):
+    """
+    Best-effort latency tuning for a freshly opened port. Each step is optional:
+    unsupported platforms and virtual ports simply keep their defaults.
+    """
+    if hasattr(ser, "set_buffer_size"):
+        # Windows: a larger driver queue survives the reader being preempted
+        ser.set_buffer_size(rx_size=rx_size, tx_size=1 << 12)
+    if hasattr(ser, "set_low_latency_mode"):
+        # Linux: ASYNC_LOW_LATENCY via TIOCGSERIAL/TIOCSSERIAL. Every POSIX port has
+        # the method, but outside Linux the base class raises NotImplementedError
+        try:
+            ser.set_low_latency_mode(True)
+        except (ValueError, NotImplementedError):
+            pass
+    if sys.platform.startswith("linux"):
+        # FTDI-style adapters hold reads for 16 ms by default; 1 ms stops samples
+        # arriving in bursts (needs write access to sysfs, usually root/udev rule)
+        name = os.path.basename(os.path.realpath(ser.port))
+        try:
+            with open(f"/sys/bus/usb-serial/devices/{name}/latency_timer", "w") as f:
+                f.write("1")
+        except OSError:
+            pass
+
+def raise_priority():
+    """
+    Best-effort: make the reading thread less likely to be preempted long enough
+    for the RX buffer to overflow. Silently keeps the default without privileges.
+    """
+    try:
+        if os.name == "nt":
+            import ctypes
+            k32 = ctypes.windll.kernel32
+            k32.SetThreadPriority(k32.GetCurrentThread(), 2)  # THREAD_PRIORITY_HIGHEST
+        else:
+            os.sched_setscheduler(0, os.SCHED_RR, os.sched_param(10))
+    except (AttributeError, OSError):
+        pass
+
+def start_writer(maxsize=8):
+    """
+    Save windows on a background thread so compression and disk I/O never hold up
+    draining the port. Put (path, arrays) on the returned queue; None flushes and stops.
+    The queue is bounded, so a disk that can't keep up eventually slows the reader
+    instead of growing memory without limit.
+    """
+    writes = queue.Queue(maxsize=maxsize)
+    def run():
+        try:
+            while True:
+                item = writes.get()
+                if item is None:
+                    return
+                path, arrays = item
+                np.savez_compressed(path, **arrays)
+        except Exception as e:
+            writer.error = e  # re-raised on the reader thread by put_window()
+    writer = threading.Thread(target=run, name="window-writer", daemon=True)
+    writer.error = None
+    writer.start()
+    return writes, writer
+
+def check_writer(writer):
+    if writer.error is not None:
+        raise RuntimeError(f"saving windows failed: {writer.error!r}") from writer.error
+
+def put_window(writes, writer, item):
+    """
+    Queue an item for the writer. If the writer has died (disk full, permissions),
+    raise its error here instead of blocking forever on a queue nobody drains.
+    """
+    while True:
+        check_writer(writer)
+        try:
+            writes.put(item, timeout=0.5)
+            return
+        except queue.Full:
+            pass
+
+def main(port="/dev/ttyUSB0", baud=115200, out_dir="./data/raw", win_s=0.5, fs=1000, binary=False, channels=2):
     buflen = int(win_s * fs)
+    if buflen < 1:
+        raise ValueError(f"win_s={win_s} is shorter than one sample at fs={fs}")
+    # POSIX waits in select() below; elsewhere read() blocks, so keep its timeout short
+    ser = serial.Serial(port, baud, timeout=1.0 if os.name == "posix" else 0.02)
+    tune_port(ser)
     os.makedirs(out_dir, exist_ok=True)
+    # start the writer first: on Linux threads inherit the creator's scheduling
+    # policy, and zlib compression shouldn't run at the reader's real-time priority
+    writes, writer = start_writer()
+    raise_priority()
+    blocks, pending = [], 0  # decoded (samples, channels) arrays not yet saved
+    seq = 0  # running window index: several windows can be carved in the same millisecond
+    rx = bytearray()
+    # POSIX: sleep on the fd itself, then drain everything that arrived in one read
+    # (Windows selectors only handle sockets, so there a fixed-size read() does the waiting)
+    sel = None
+    if os.name == "posix":
+        sel = selectors.DefaultSelector()
+        sel.register(ser.fileno(), selectors.EVENT_READ)
     print(f"Opened serial {port} @ {baud}")
     try:
         while True:
-            line = ser.readline().decode(errors="ignore").strip()
-            if not line:
-                continue
-            # Expect CSV: val1,val2,val3...
-            parts = line.split(",")
-            try:
-                vals = [float(p) for p in parts]
-            except:
+            if sel is not None and not sel.select(timeout=1.0):
                 continue
-            buf.append(vals)
-            if len(buf) >= buflen:
-                arr = np.array(buf[-buflen:]).T
+            if sel is None:
+                # returns whatever arrived within the 20 ms timeout, no in_waiting poll
+                rx += ser.read(READ_CHUNK)
+            else:
+                # "or 1" keeps pyserial's disconnect detection when the fd is readable but empty
+                rx += ser.read(ser.in_waiting or 1)
+            if binary:
+                samples, used = parse_packets(rx, channels)
+            else:
+                # Expect CSV lines: val1,val2,val3...
+                samples, used = parse_lines(rx)
+            del rx[:used]
+            if len(samples):
+                if blocks and samples.shape[1] != blocks[-1].shape[1]:
+                    # width changed between reads (e.g. the first read after opening was
+                    # the tail of a line): keep the newest shape, as parse_lines does
+                    blocks, pending = [], 0
+                blocks.append(samples)
+                pending += len(samples)
+            # one read can complete more than one window; carve them off in order
+            while pending >= buflen:
+                block = np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+                arr = block[:buflen].T
                 ts = int(time.time()*1000)
-                np.savez_compressed(os.path.join(out_dir, f"serial_window_{ts}.npz"), data=arr, fs=fs, timestamp=ts)
-                buf = []
+                path = os.path.join(out_dir, f"serial_window_{ts}_{seq:06d}.npz")
+                put_window(writes, writer, (path, dict(data=arr, fs=fs, timestamp=ts, index=seq)))
+                seq += 1
+                blocks = [block[buflen:]]
+                pending -= buflen
     except KeyboardInterrupt:
+        pass
+    finally:
+        if sel is not None:
+            sel.close()
         ser.close()
-        print("Stopped.")
+        if writer.error is None:
+            put_window(writes, writer, None)
+            writer.join()  # finish saving windows already queued
+        check_writer(writer)
+    print("Stopped.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", default="/dev/ttyUSB0")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--out_dir", default="./data/raw")
+    parser.add_argument("--fs", type=int, default=1000)
+    parser.add_argument("--win_s", type=float, default=0.5)
+    parser.add_argument("--binary", action="store_true", help="Chords binary packets instead of CSV lines")
+    parser.add_argument("--channels", type=int, default=2, help="channels per binary packet")
+    args = parser.parse_args()
+    if int(args.win_s * args.fs) < 1:
+        parser.error(f"--win_s must be at least one sample (1/fs = {1 / args.fs:g} s)")
+    main(args.port, args.baud, args.out_dir, args.win_s, args.fs, args.binary, args.channels)
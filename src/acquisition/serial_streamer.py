@@ -1,28 +1,40 @@
 # src/acquisition/serial_streamer.py
 
+import os
+import sys
 import serial
 import time
 import numpy as np
-import struct
+
+# the reader owns the Chords framing, so sender and parser can't drift apart
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from acquisition.serial_aquirer import SYNC_BYTE_1, SYNC_BYTE_2, END_BYTE, packet_dtype
+
+ADC_MID = 8192  # mid-scale of a 14-bit ADC
 
 class ChordsSerialStreamer:
     """Stream mock BCI data to Chords via serial port"""
     
-    def __init__(self, port='/dev/pts/2', baudrate=115200, channels=8, fs=250):
+    def __init__(self, port='/dev/pts/2', baudrate=115200, channels=8, fs=250, binary=False):
         """
         Args:
             port: Serial port (use virtual port from socat)
             baudrate: Must match Chords settings (usually 115200 or 230400)
             channels: Number of EEG/EMG/EOG channels
             fs: Sampling rate in Hz
+            binary: Send fixed-width binary packets instead of CSV lines
         """
         self.port = port
         self.baudrate = baudrate
         self.channels = channels
         self.fs = fs
+        self.binary = binary
         self.ser = None
+        # one record per packet, so a whole block is packed in a few array assignments
+        self._pkt = packet_dtype(channels)
+        self._counter = 0
     
-    def connect(self):
+    def connect(self, settle_timeout=2.0):
         """Open serial connection"""
         try:
             self.ser = serial.Serial(
@@ -34,25 +46,47 @@ class ChordsSerialStreamer:
                 timeout=1
             )
             print(f"✓ Connected to {self.port} at {self.baudrate} baud")
-            time.sleep(2)  # Wait for connection to stabilize
+            self.wait_until_ready(settle_timeout)
             return True
         except Exception as e:
             print(f"✗ Failed to connect: {e}")
             return False
     
+    def wait_until_ready(self, timeout=2.0, poll=0.05):
+        """
+        Wait for the connection to stabilize, returning as soon as the other
+        end shows up (DSR raised by a null-modem pair, or any byte received)
+        instead of always sleeping for the full timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if self.ser.in_waiting or self.ser.dsr:
+                    return True
+            except (OSError, serial.SerialException):
+                # no modem lines (e.g. a pty): fall back to the fixed wait
+                time.sleep(max(0.0, deadline - time.monotonic()))
+                return False
+            time.sleep(poll)
+        return False
+    
     def generate_sample(self):
         """Generate one sample of mock data (all channels)"""
+        return self.generate_block(1)[0]
+    
+    def generate_block(self, n):
+        """Generate n samples of mock data, shape (n, channels)"""
         # Base noise
-        sample = 0.1 * np.random.randn(self.channels)
+        block = 0.1 * np.random.randn(n, self.channels)
         
         # Add occasional "event" (blink, movement, etc.)
-        if np.random.rand() < 0.05:  # 5% chance
-            sample += 2.0 * np.random.randn(self.channels)
+        events = np.random.rand(n) < 0.05  # 5% chance per sample
+        block[events] += 2.0 * np.random.randn(int(events.sum()), self.channels)
         
         # Scale to microvolts (typical EEG range: ±100 µV)
-        sample = sample * 50.0  # ±5 µV baseline noise, ±100 µV events
+        block *= 50.0  # ±5 µV baseline noise, ±100 µV events
         
-        return sample
+        return block
     
     def format_for_chords(self, sample):
         """
@@ -65,17 +99,29 @@ class ChordsSerialStreamer:
         
         Check Chords documentation for exact format!
         """
-        # Common format: comma-separated values + newline
+        rows = np.atleast_2d(sample)
+        if self.binary:
+            # 4 + 2*channels bytes per sample, values as ADC counts around mid-scale
+            pkts = np.empty(len(rows), dtype=self._pkt)
+            pkts["sync"] = (SYNC_BYTE_1, SYNC_BYTE_2)
+            pkts["counter"] = (self._counter + np.arange(len(rows))) & 0xFF
+            pkts["data"] = np.clip(rows + ADC_MID, 0, 2 * ADC_MID - 1)
+            pkts["end"] = END_BYTE
+            self._counter = (self._counter + len(rows)) & 0xFF
+            return pkts.tobytes()
+        
+        # Common format: comma-separated values + newline, one line per sample
         # Example: "ch1,ch2,ch3,ch4,ch5,ch6,ch7,ch8\n"
-        formatted = ",".join([f"{int(val)}" for val in sample]) + "\n"
+        formatted = "".join(",".join(map(str, row)) + "\n" for row in rows.astype(int).tolist())
         return formatted.encode('utf-8')
     
-    def stream(self, duration=None):
+    def stream(self, duration=None, chunk_s=0.1):
         """
         Stream data continuously
         
         Args:
             duration: Stream duration in seconds (None = infinite)
+            chunk_s: Seconds of samples sent per write (one syscall per chunk)
         """
         if not self.ser:
             print("Not connected! Call connect() first.")
@@ -84,28 +130,32 @@ class ChordsSerialStreamer:
         print(f"Streaming {self.channels} channels at {self.fs} Hz...")
         print("Press Ctrl+C to stop")
         
-        start_time = time.time()
+        start_time = time.monotonic()
         sample_count = 0
+        chunk = max(1, int(self.fs * chunk_s))
         
         try:
             while True:
-                # Generate and send one sample
-                sample = self.generate_sample()
-                data = self.format_for_chords(sample)
+                # Generate and send one chunk of samples in a single write
+                block = self.generate_block(chunk)
+                data = self.format_for_chords(block)
                 self.ser.write(data)
                 
-                sample_count += 1
+                sample_count += chunk
                 
-                # Maintain sampling rate
-                time.sleep(1.0 / self.fs)
+                # Maintain sampling rate against a monotonic clock, so sleep overshoot doesn't
+                # accumulate and wall-clock steps (NTP, DST) don't stall or burst the stream
+                delay = start_time + sample_count / self.fs - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
                 
                 # Status update every second
-                if sample_count % self.fs == 0:
-                    elapsed = time.time() - start_time
+                if sample_count // self.fs != (sample_count - chunk) // self.fs:
+                    elapsed = time.monotonic() - start_time
                     print(f"Sent {sample_count} samples ({elapsed:.1f}s)")
                 
                 # Stop after duration if specified
-                if duration and (time.time() - start_time) >= duration:
+                if duration and (time.monotonic() - start_time) >= duration:
                     break
                     
         except KeyboardInterrupt:
@@ -129,7 +179,8 @@ if __name__ == "__main__":
         port= "COM6",      # Change to your virtual port
         baudrate=115200,        # Match Chords settings
         channels=8,             # EEG channels
-        fs=250                  # Sampling rate
+        fs=250,                 # Sampling rate
+        binary=False            # True: Chords binary packets (read with serial_aquirer --binary)
     )
     
     if streamer.connect():
@@ -1,20 +1,56 @@
 # features.py
+from functools import lru_cache
 import numpy as np
 from scipy.signal import welch
 
 BANDS = {"delta":(1,4),"theta":(4,8),"alpha":(8,12),"beta":(12,30),"gamma":(30,45)}
 
+def segment_length(n, fs):
+    return int(min(n, fs*2))
+
+def psd(x, fs):
+    # x: (..., samples); Welch PSD along the last axis
+    return welch(x, fs=fs, nperseg=segment_length(x.shape[-1], fs), axis=-1)
+
+def trapezoid_weights(f, band):
+    # w such that Pxx @ w is the trapezoidal integral of Pxx over the band
+    w = np.zeros(len(f))
+    idx = np.flatnonzero((f>=band[0]) & (f<=band[1]))
+    half = np.diff(f[idx]) / 2
+    w[idx[:-1]] += half
+    w[idx[1:]] += half
+    return w
+
+@lru_cache(maxsize=16)
+def band_weights(fs, nperseg):
+    # (freqs, bands) weights on Welch's frequency grid; every band power of every
+    # channel is then a single matrix product Pxx @ W
+    f = np.fft.rfftfreq(nperseg, 1 / fs)
+    W = np.column_stack([trapezoid_weights(f, band) for band in BANDS.values()])
+    W.flags.writeable = False  # shared by every caller
+    return W
+
+def integrate_band(f, Pxx, band):
+    return Pxx @ trapezoid_weights(f, band)
+
 def bandpower(x, fs, band):
-    f, Pxx = welch(x, fs=fs, nperseg=min(len(x), fs*2))
-    idx = (f>=band[0]) & (f<=band[1])
-    return np.trapz(Pxx[idx], f[idx]) if idx.any() else 0.0
+    # returns one power per leading index (all channels at once)
+    f, Pxx = psd(x, fs)
+    return integrate_band(f, Pxx, band)
 
 def extract_features(window, fs):
-    # window: (channels, samples)
-    feats = []
-    for ch in range(window.shape[0]):
-        d = window[ch]
-        feats += [d.mean(), d.std(), np.sqrt(np.mean(d**2))]  # mean, std, RMS
-        for band in BANDS.values():
-            feats.append(bandpower(d, fs, band))
-    return np.array(feats)
+    # window: (channels, samples); every step runs across all channels together.
+    # Callers often pass a transposed (samples, channels) array; one up-front copy to
+    # C order keeps every reduction and the FFT on unit-stride rows (no-op otherwise)
+    window = np.ascontiguousarray(window)
+    # mean, std and RMS from one sum and one sum of squares per channel, instead of
+    # three passes and a window**2 temporary; accumulated in float64 so a large DC
+    # offset (raw ADC counts) doesn't cancel out the variance of float32 input
+    n = window.shape[-1]
+    mean = window.sum(axis=-1, dtype=np.float64) / n
+    ms = np.einsum("...i,...i->...", window, window, dtype=np.float64) / n
+    cols = [mean, np.sqrt(np.maximum(ms - mean**2, 0.0)), np.sqrt(ms)]
+    f, Pxx = psd(window, fs)  # one PSD for all bands, integrated with precomputed weights
+    powers = Pxx @ band_weights(fs, segment_length(window.shape[-1], fs))  # (channels, bands)
+    # same layout as the per-channel loop: [mean, std, rms, <band powers>] per channel
+    return np.column_stack(cols + [powers]).ravel()
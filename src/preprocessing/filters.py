@@ -1,11 +1,58 @@
 # filters.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from scipy.signal import butter, sosfiltfilt, iirnotch
 import numpy as np
 
-def bandpass(data, fs, low=1.0, high=45.0, order=4):
-    sos = butter(order, [low, high], btype="band", fs=fs, output="sos")
+def forward_backward(sos, data):
+    # float32 windows (most LSL streams) come back as float32 so callers keep the
+    # memory saving, but are filtered in float64: float32 input or coefficients
+    # drift by up to ~3e-2 relative on DC-offset data and low/narrow bands
+    if getattr(data, "dtype", None) == np.float32:
+        return sosfiltfilt(sos, data.astype(np.float64), axis=-1).astype(np.float32)
     return sosfiltfilt(sos, data, axis=-1)
 
-def notch50(data, fs, f0=50.0, q=30.0):
+@lru_cache(maxsize=32)
+def bandpass_sos(fs, low, high, order):
+    # the same parameters come back for every window; design once, reuse after.
+    # Cached arrays are shared by every caller, so don't modify them in place.
+    return butter(order, [low, high], btype="band", fs=fs, output="sos")
+
+def bandpass(data, fs, low=1.0, high=45.0, order=4):
+    return forward_backward(bandpass_sos(fs, low, high, order), data)
+
+@lru_cache(maxsize=32)
+def notch_sos(fs, f0, q):
+    # iirnotch is a single biquad: as one SOS section [b0 b1 b2 1 a1 a2] it runs
+    # through the same compiled cascade as bandpass, with no per-sample Python
     b, a = iirnotch(f0, q, fs)
-    return sosfiltfilt(np.array([b]), data, axis=-1) if False else np.apply_along_axis(lambda x: x, 0, data)  # placeholder
+    return np.concatenate([b, a])[np.newaxis, :]
+
+@lru_cache(maxsize=32)
+def bandpass_notch_sos(fs, low, high, order, f0, q):
+    return np.vstack([bandpass_sos(fs, low, high, order), notch_sos(fs, f0, q)])
+
+def notch50(data, fs, f0=50.0, q=30.0):
+    return forward_backward(notch_sos(fs, f0, q), data)
+
+def bandpass_notch(data, fs, low=1.0, high=45.0, order=4, f0=50.0, q=30.0):
+    # bandpass followed by notch50 as one cascade: a single forward-backward pass
+    # over the data instead of one per filter
+    sos = bandpass_notch_sos(fs, low, high, order, f0, q)
+    return forward_backward(sos, data)
+
+def filter_channels(func, data, fs, workers=None, **kwargs):
+    """
+    Apply one of the filters above with the channels (rows) split across threads.
+    scipy's sosfilt loop releases the GIL, so on long multi-channel recordings each
+    group of rows filters on its own core. Short windows aren't worth the dispatch;
+    call the filter directly for those.
+    """
+    data = np.asarray(data)
+    workers = min(workers or os.cpu_count() or 1, len(data)) if data.ndim > 1 else 1
+    if workers <= 1:
+        return func(data, fs, **kwargs)
+    with ThreadPoolExecutor(workers) as ex:
+        parts = ex.map(lambda rows: func(rows, fs, **kwargs), np.array_split(data, workers))
+        return np.concatenate(list(parts))
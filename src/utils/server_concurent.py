@@ -1,6 +1,6 @@
 # server_concurrent.py
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-import asyncio, json
+import asyncio, orjson
 
 app = FastAPI()
 
@@ -9,7 +9,7 @@ async def reader(ws: WebSocket, stop_event: asyncio.Event):
         while not stop_event.is_set():
             data = await ws.receive_text()
             try:
-                payload = json.loads(data)
+                payload = orjson.loads(data)
             except Exception:
                 continue
             if payload.get("type") == "ping":
@@ -21,7 +21,7 @@ async def reader(ws: WebSocket, stop_event: asyncio.Event):
                     "server_recv": server_recv,
                     "server_send": server_recv
                 }
-                await ws.send_text(json.dumps(resp))
+                await ws.send_text(orjson.dumps(resp).decode())
     except Exception:
         pass
 
@@ -31,6 +31,6 @@ async def writer_stub(ws: WebSocket, stop_event: asyncio.Event):
         while not stop_event.is_set():
             await asyncio.sleep(1.0)
             # optionally send sensor data here
-            # await ws.send_text(json.dumps(...))
+            # await ws.send_text(orjson.dumps(...).decode())
     except Exception:
         pass
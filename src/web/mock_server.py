@@ -1,7 +1,8 @@
 import asyncio
-import json
+import time
+import orjson
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 import uvicorn
 import numpy as np
 from typing import List
@@ -26,16 +27,19 @@ class ConnectionManager:
     async def broadcast(self, message: dict):
         if not self.active:
             return
-        data = json.dumps(message)
+        # numpy arrays (e.g. "window") are serialised directly, no tolist() round trip
+        data = orjson.dumps(message, option=orjson.OPT_SERIALIZE_NUMPY).decode()
         # send concurrently
         await asyncio.gather(*(ws.send_text(data) for ws in self.active), return_exceptions=True)
 
 manager = ConnectionManager()
 
-# Health endpoint
+# Health endpoint (constant body, encoded once instead of per request)
+HEALTH_OK = b'{"status":"ok"}'
+
 @app.get("/health")
 async def health():
-    return JSONResponse({"status": "ok"})
+    return Response(HEALTH_OK, media_type="application/json")
 
 # Simple inference REST endpoint: upload a window (channels x samples)
 @app.post("/infer")
@@ -54,9 +58,14 @@ async def websocket_endpoint(ws: WebSocket):
     await manager.connect(ws)
     try:
         while True:
-            # This server expects no messages from clients; keep connection alive
-            await asyncio.sleep(60)
+            # Clients send nothing meaningful, but blocking on receive (instead of
+            # sleeping) is what surfaces WebSocketDisconnect as soon as they leave
+            await ws.receive_text()
     except WebSocketDisconnect:
+        pass
+    finally:
+        # any other failure (e.g. a binary frame makes receive_text raise) must not
+        # leave a dead socket in the broadcast list
         manager.disconnect(ws)
 
 # Continuous streaming simulator task (starts when app starts)
@@ -82,6 +91,9 @@ async def sensor_streaming_task():
     loop = asyncio.get_event_loop()
     while True:
         start_time = loop.time()
+        # one wall-clock stamp per tick, shared by every modality's chunk; clients
+        # derive per-sample times from it and fs (loop.time() is not epoch-based)
+        tick_ms = time.time_ns() // 1_000_000
         for mod in modalities:
             ch = chans[mod]
             # generate time vector for this chunk (relative)
@@ -97,9 +109,9 @@ async def sensor_streaming_task():
                 freq = 60.0  # higher broadband
             else:  # EOG
                 freq = 1.0  # slow drift / eye movement
-            for c in range(ch):
-                phase_shift = np.random.uniform(0, 2 * np.pi)
-                base[c] += 0.02 * np.sin(2 * np.pi * freq * t + phase_shift)
+            # all channels at once: (ch, 1) random phases broadcast against t
+            phase_shift = np.random.uniform(0, 2 * np.pi, size=(ch, 1))
+            base += 0.02 * np.sin(2 * np.pi * freq * t + phase_shift)
 
             # transient injection logic (simulate blink/jaw/motor)
             if not transient_state[mod]["active"] and np.random.rand() < 0.02:
@@ -117,9 +129,8 @@ async def sensor_streaming_task():
                 # simple half-gaussian on the applied samples
                 env_part = np.exp(-np.linspace(0, 3, apply_samples) ** 2)
                 env[:apply_samples] = env_part
-                # apply the transient across all channels
-                for c in range(ch):
-                    base[c, :chunk_size] += transient_state[mod]["amplitude"] * env
+                # apply the transient across all channels (env broadcasts over rows)
+                base += transient_state[mod]["amplitude"] * env
                 transient_state[mod]["remaining_samples"] -= apply_samples
                 if transient_state[mod]["remaining_samples"] <= 0:
                     transient_state[mod]["active"] = False
@@ -128,7 +139,7 @@ async def sensor_streaming_task():
             # update phase (advance time)
             phase[mod] += chunk_size / fs
 
-            window = base.tolist()  # channels x samples for this chunk
+            window = base  # channels x samples for this chunk
 
             # compute a lightweight running score/pred on this chunk
             mean_abs = float(np.mean(np.abs(base)))
@@ -137,7 +148,7 @@ async def sensor_streaming_task():
 
             message = {
                 "source": mod,
-                "timestamp": int(loop.time() * 1000),
+                "timestamp": tick_ms,
                 "pred": {"label": label, "prob": round(prob, 3)},
                 # Chunk-level streaming payload: 'chunk_samples' and data as channels x samples
                 "chunk_samples": chunk_size,
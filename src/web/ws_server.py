@@ -2,10 +2,9 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-import asyncio, json, joblib
+import asyncio, joblib
 # src/web/ws_server.py
 import asyncio
-import json
 import logging
 import os
 import time
@@ -13,6 +12,7 @@ from typing import Any, Dict, Optional
 
 import joblib
 import numpy as np
+import orjson
 import websockets
 
 # local import - ensure Python path is set so this resolves (run from project root or use PYTHONPATH)
@@ -89,7 +89,7 @@ async def handler(ws: websockets.WebSocketServerProtocol, path: str) -> None:
     try:
         async for msg in ws:
             try:
-                payload = json.loads(msg)
+                payload = orjson.loads(msg)
                 raw = payload.get("data")
                 if raw is None:
                     raise ValueError("missing 'data' field in payload")
@@ -113,10 +113,10 @@ async def handler(ws: websockets.WebSocketServerProtocol, path: str) -> None:
                     "pred": {"label": pred["label"], "prob": pred["prob"]},
                     "timestamp": timestamp_ms,
                 }
-                await ws.send(json.dumps(out))
+                await ws.send(orjson.dumps(out).decode())
             except Exception as e:
                 logger.exception("Error handling message: %s", e)
-                await ws.send(json.dumps({"error": str(e)}))
+                await ws.send(orjson.dumps({"error": str(e)}).decode())
     except websockets.ConnectionClosedOK:
         logger.info("Connection closed normally: %s", ws.remote_address)
     except websockets.ConnectionClosedError as e:
@@ -0,0 +1,150 @@
+import os
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+pytest.importorskip("serial")
+
+from acquisition import serial_aquirer
+from acquisition.serial_aquirer import parse_packets, parse_lines, packet_len, start_writer, put_window, check_writer
+from acquisition.serial_streamer import ChordsSerialStreamer, ADC_MID
+
+
+def feed(chunks, channels):
+    """Feed byte chunks through parse_packets the way main() does."""
+    rx, out = bytearray(), []
+    for chunk in chunks:
+        rx += chunk
+        samples, used = parse_packets(rx, channels)
+        del rx[:used]
+        out.append(samples)
+    return np.concatenate(out)
+
+
+def split_odd(data, sizes=(1, 3, 7, 13, 5)):
+    chunks, i, k = [], 0, 0
+    while i < len(data):
+        chunks.append(data[i:i + sizes[k % len(sizes)]])
+        i += sizes[k % len(sizes)]
+        k += 1
+    return chunks
+
+
+def test_parse_packets_roundtrips_streamer_output():
+    channels = 3
+    streamer = ChordsSerialStreamer(channels=channels, binary=True)
+    block = streamer.generate_block(300)  # > 256 packets, so the counter wraps
+    data = b"\x00\xc7garbage" + streamer.format_for_chords(block[:100]) + streamer.format_for_chords(block[100:])
+    expected = np.clip(block + ADC_MID, 0, 2 * ADC_MID - 1).astype(np.uint16)
+
+    samples = feed(split_odd(data), channels)
+
+    np.testing.assert_array_equal(samples, expected)
+
+
+def test_parse_packets_skips_sync_pattern_inside_payload():
+    channels = 3
+    pkt = struct.Struct(f">BBB{channels}HB")
+    # ch0 = 0xC77C puts a sync pair at offset 3, and the next packet's counter (1)
+    # sits where that false packet's end byte would be
+    rows = [(0xC77C, 2, 3), (4, 5, 6), (7, 8, 9)]
+    data = b"".join(pkt.pack(0xC7, 0x7C, i, *row, 0x01) for i, row in enumerate(rows))
+    assert packet_len(channels) == pkt.size
+
+    samples = feed(split_odd(data), channels)
+
+    np.testing.assert_array_equal(samples, np.array(rows, dtype=np.uint16))
+
+
+def test_parse_lines_skips_banner_and_keeps_partial_line():
+    rx = bytearray(b"Chords v1 ready\r\n1,2,3\r\n4,5,6\n7,8")
+
+    rows, used = parse_lines(rx)
+    del rx[:used]
+
+    np.testing.assert_array_equal(rows, [[1, 2, 3], [4, 5, 6]])
+    assert rx == b"7,8"
+
+    rx += b",9\n"
+    rows, used = parse_lines(rx)
+    np.testing.assert_array_equal(rows, [[7, 8, 9]])
+    assert used == len(rx)
+
+
+def test_parse_lines_without_newline_consumes_nothing():
+    rows, used = parse_lines(bytearray(b"1,2,3"))
+    assert used == 0 and rows.size == 0
+
+
+def test_main_rejects_window_shorter_than_one_sample():
+    with pytest.raises(ValueError):
+        serial_aquirer.main(port="/nonexistent", win_s=0.0005, fs=1000)
+
+
+def test_writer_saves_queued_windows_before_stopping(tmp_path):
+    writes, writer = start_writer(maxsize=2)
+    for i in range(5):
+        put_window(writes, writer, (str(tmp_path / f"w{i}.npz"), dict(data=np.full(3, i))))
+    put_window(writes, writer, None)
+    writer.join(5)
+
+    check_writer(writer)
+    assert [int(np.load(tmp_path / f"w{i}.npz")["data"][0]) for i in range(5)] == list(range(5))
+
+
+def test_writer_failure_is_raised_on_the_reader(tmp_path):
+    writes, writer = start_writer(maxsize=1)
+    put_window(writes, writer, (str(tmp_path / "missing" / "w.npz"), dict(data=np.zeros(3))))
+    writer.join(5)
+
+    # the queue is nobody's anymore: putting must raise instead of blocking forever
+    with pytest.raises(RuntimeError) as exc:
+        for _ in range(3):
+            put_window(writes, writer, (str(tmp_path / "w.npz"), dict(data=np.zeros(3))))
+    assert isinstance(exc.value.__cause__, OSError)
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pseudo-terminal pair")
+def test_one_read_completing_several_windows_saves_distinct_files(tmp_path, monkeypatch):
+    opened = threading.Event()
+    # pyserial flushes input on open, so only write once the reader has the port;
+    # and keep the test thread off SCHED_RR when run as root
+    monkeypatch.setattr(serial_aquirer, "tune_port", lambda ser: opened.set())
+    monkeypatch.setattr(serial_aquirer, "raise_priority", lambda: None)
+    master, slave = os.openpty()
+    errors = []
+
+    def run():
+        try:
+            serial_aquirer.main(port=os.ttyname(slave), out_dir=str(tmp_path), win_s=0.5, fs=1000)
+        except Exception as e:
+            errors.append(e)
+
+    reader = threading.Thread(target=run, daemon=True)
+    reader.start()
+    assert opened.wait(5)
+
+    data = b"".join(b"%d,%d\n" % (i, -i) for i in range(3000))
+    while data:
+        data = data[os.write(master, data):]
+    deadline = time.monotonic() + 5
+    while len(os.listdir(tmp_path)) < 6 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    # closing the pty makes the reader's next read fail (EIO), which ends main()
+    os.close(master)
+    reader.join(5)
+    os.close(slave)
+
+    assert not reader.is_alive()
+    assert len(errors) == 1 and isinstance(errors[0], OSError), errors
+    files = sorted(os.listdir(tmp_path))
+    assert len(files) == 6
+    windows = sorted((np.load(tmp_path / f) for f in files), key=lambda w: int(w["index"]))
+    assert [int(w["index"]) for w in windows] == list(range(6))
+    data = np.concatenate([w["data"] for w in windows], axis=1)
+    np.testing.assert_array_equal(data[0], np.arange(3000))
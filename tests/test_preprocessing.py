@@ -0,0 +1,82 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from scipy.signal import filtfilt, iirnotch, welch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from preprocessing.features import BANDS, extract_features
+from preprocessing.filters import bandpass, bandpass_notch, filter_channels, notch50
+
+trapezoid = getattr(np, "trapezoid", None) or np.trapz
+
+
+def per_channel_features(window, fs):
+    """The original one-channel-at-a-time implementation."""
+    feats = []
+    for d in window:
+        feats += [d.mean(), d.std(), np.sqrt(np.mean(d**2))]
+        for lo, hi in BANDS.values():
+            f, Pxx = welch(d, fs=fs, nperseg=min(len(d), fs*2))
+            idx = (f>=lo) & (f<=hi)
+            feats.append(trapezoid(Pxx[idx], f[idx]) if idx.any() else 0.0)
+    return np.array(feats)
+
+
+@pytest.mark.parametrize("fs,channels,samples", [(250, 8, 250), (250, 3, 600), (500, 2, 250), (250, 2, 3)])
+def test_extract_features_matches_per_channel_loop(fs, channels, samples):
+    window = np.random.default_rng(0).standard_normal((channels, samples)) * 10 + 3
+    np.testing.assert_allclose(extract_features(window, fs), per_channel_features(window, fs), rtol=1e-9, atol=1e-12)
+
+
+def test_extract_features_accepts_transposed_window():
+    window = np.random.default_rng(1).standard_normal((500, 4)).T  # Fortran-ordered, as pipeline.py passes it
+    np.testing.assert_allclose(extract_features(window, 250), per_channel_features(window, 250), rtol=1e-9, atol=1e-12)
+
+
+def test_extract_features_std_survives_dc_offset_in_float32():
+    window = (np.random.default_rng(2).standard_normal((2, 500)) * 10 + 8192).astype(np.float32)
+    std = extract_features(window, 250).reshape(2, -1)[:, 1]
+    np.testing.assert_allclose(std, window.astype(np.float64).std(axis=-1), rtol=1e-9)
+
+
+@pytest.mark.parametrize("dtype,expected", [(np.float32, np.float32), (np.float64, np.float64), (np.int16, np.float64)])
+def test_filters_keep_float32_input_float32(dtype, expected):
+    x = (np.random.default_rng(5).standard_normal((2, 1000)) * 50).astype(dtype)
+    for y in (bandpass(x, 250), notch50(x, 250), bandpass_notch(x, 250)):
+        assert y.dtype == expected
+
+
+@pytest.mark.parametrize("fs,low,high", [(250, 1.0, 45.0), (1000, 0.5, 45.0), (250, 0.1, 10.0)])
+def test_float32_input_is_filtered_at_float64_precision(fs, low, high):
+    # raw ADC counts: a large DC offset is where float32 state used to drift
+    x = (np.random.default_rng(7).standard_normal((2, 20 * fs)) * 50 + 8192).astype(np.float32)
+    y = bandpass(x, fs, low, high)
+    np.testing.assert_array_equal(y, bandpass(x.astype(np.float64), fs, low, high).astype(np.float32))
+
+
+def test_notch50_matches_filtfilt():
+    x = np.random.default_rng(3).standard_normal((3, 2000))
+    b, a = iirnotch(50.0, 30.0, 250)
+    np.testing.assert_allclose(notch50(x, 250), filtfilt(b, a, x, axis=-1), atol=1e-12)
+
+
+def test_notch50_removes_mains():
+    t = np.arange(5000) / 250
+    x = np.sin(2 * np.pi * 10 * t) + np.sin(2 * np.pi * 50 * t)
+    f, Pxx = welch(notch50(x, 250), 250)
+    assert Pxx[np.argmin(abs(f - 50))] < 1e-3 * Pxx[np.argmin(abs(f - 10))]
+
+
+def test_bandpass_notch_matches_separate_filters_away_from_edges():
+    x = np.random.default_rng(4).standard_normal((2, 15000))
+    combined, separate = bandpass_notch(x, 250), notch50(bandpass(x, 250), 250)
+    np.testing.assert_allclose(combined[:, 2500:-2500], separate[:, 2500:-2500], atol=1e-3)
+
+
+@pytest.mark.parametrize("workers", [1, 3, 8])
+def test_filter_channels_matches_direct_call(workers):
+    x = np.random.default_rng(6).standard_normal((8, 3000))
+    np.testing.assert_array_equal(filter_channels(bandpass_notch, x, 250, workers=workers), bandpass_notch(x, 250))